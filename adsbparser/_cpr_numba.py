@@ -0,0 +1,158 @@
+"""
+Airborne CPR position decode (even/odd pairs), compiled with Numba when available.
+
+Port of pyModeS ``adsb.airborne_position`` working on the integer CPR fields
+instead of hex strings. Without numba the same functions run as plain Python.
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: return the function unchanged."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# 2^17: CPR lat/lon are 17-bit fractions of a zone
+CPR_MAX = 131072.0
+_NZ = 15
+
+# Latitudes (degrees) where NL drops from 59 -> 58, ..., 3 -> 2, then 2 -> 1 at 87
+_NL_TRANSITIONS = np.append(
+    np.degrees(
+        np.arccos(
+            np.sqrt(
+                (1.0 - np.cos(np.pi / (2 * _NZ)))
+                / (1.0 - np.cos(2.0 * np.pi / np.arange(59, 2, -1)))
+            )
+        )
+    ),
+    87.0,
+)
+
+
+@njit(cache=True)
+def cpr_nl(lat: float) -> int:
+    """Number of longitude zones at a latitude (table lookup)."""
+    return 59 - np.searchsorted(_NL_TRANSITIONS, abs(lat))
+
+
+@njit(cache=True)
+def cpr_position(
+    lat_cpr_e: int,
+    lon_cpr_e: int,
+    lat_cpr_o: int,
+    lon_cpr_o: int,
+    t_e: int,
+    t_o: int,
+) -> Tuple[float, float]:
+    """
+    Global airborne position from one even and one odd CPR frame.
+
+    Args:
+        lat_cpr_e, lon_cpr_e: 17-bit CPR lat/lon of the even frame.
+        lat_cpr_o, lon_cpr_o: 17-bit CPR lat/lon of the odd frame.
+        t_e, t_o: Frame timestamps; the newer frame sets the position.
+
+    Returns:
+        (lat, lon) in degrees, or (nan, nan) if the frames fall in different
+        latitude zones.
+    """
+    lat_e = lat_cpr_e / CPR_MAX
+    lon_e = lon_cpr_e / CPR_MAX
+    lat_o = lat_cpr_o / CPR_MAX
+    lon_o = lon_cpr_o / CPR_MAX
+
+    j = math.floor(59 * lat_e - 60 * lat_o + 0.5)
+    lat_even = (360.0 / 60) * (j % 60 + lat_e)
+    lat_odd = (360.0 / 59) * (j % 59 + lat_o)
+    if lat_even >= 270:
+        lat_even -= 360
+    if lat_odd >= 270:
+        lat_odd -= 360
+
+    nl = cpr_nl(lat_even)
+    if nl != cpr_nl(lat_odd):
+        return math.nan, math.nan
+
+    m = math.floor(lon_e * (nl - 1) - lon_o * nl + 0.5)
+    if t_e > t_o:
+        lat = lat_even
+        ni = max(nl, 1)
+        lon = (360.0 / ni) * (m % ni + lon_e)
+    else:
+        lat = lat_odd
+        ni = max(nl - 1, 1)
+        lon = (360.0 / ni) * (m % ni + lon_o)
+    if lon > 180:
+        lon -= 360
+    return lat, lon
+
+
+@njit(cache=True)
+def pair_positions(
+    group: np.ndarray,
+    oe: np.ndarray,
+    baro: np.ndarray,
+    lat_cpr: np.ndarray,
+    lon_cpr: np.ndarray,
+    t_stamps: np.ndarray,
+    out: np.ndarray,
+) -> int:
+    """
+    Pair even/odd frames per aircraft and decode their positions into out.
+
+    Frames must be airborne position frames sorted by group, then time. The
+    latest even and odd frame of a group form a pair; a decoded pair (or one
+    mixing baro and GNSS altitude frames) is consumed, a zone mismatch is not.
+
+    Args:
+        group: Aircraft index per frame.
+        oe: Odd/even flag per frame.
+        baro: True for type codes 9-18, False for 20-22.
+        lat_cpr, lon_cpr: 17-bit CPR fields per frame.
+        t_stamps: Frame timestamps.
+        out: Preallocated (N, 2) float64 array for (lat, lon).
+
+    Returns:
+        Number of rows of out that were filled.
+    """
+    n = 0
+    current = -1
+    i_even = -1
+    i_odd = -1
+    for i in range(group.shape[0]):
+        if group[i] != current:
+            current = group[i]
+            i_even = -1
+            i_odd = -1
+        if oe[i] == 0:
+            i_even = i
+        else:
+            i_odd = i
+        if i_even < 0 or i_odd < 0:
+            continue
+        if baro[i_even] == baro[i_odd]:
+            lat, lon = cpr_position(
+                lat_cpr[i_even], lon_cpr[i_even],
+                lat_cpr[i_odd], lon_cpr[i_odd],
+                t_stamps[i_even], t_stamps[i_odd],
+            )
+            if math.isnan(lat):
+                continue
+            out[n, 0] = lat
+            out[n, 1] = lon
+            n += 1
+        i_even = -1
+        i_odd = -1
+    return n
@@ -6,12 +6,16 @@ import math
 class PositionData:
     """Lat/lon position in degrees."""
 
+    __slots__ = ("lat", "lon")
+
     def __init__(self, lat: float, lon: float):
         self.lat = lat
         self.lon = lon
 
     def get_distance_to(self, other: "PositionData") -> float:
-        """Return distance in miles to another position (flat-Earth)."""
+        """Return distance in miles to another position (flat-Earth), or 9999999.0 if invalid."""
+        if not isinstance(other, PositionData):
+            return 9999999.0
         return calculate_distance_between_points(self, other)
 
 
@@ -20,6 +24,23 @@ FEET_PER_DEGREE_LAT = 60.0 * 6076.115
 FEET_PER_MILE = 5280.0
 
 
+def squared_distance_feet(lat1, lon1, lat2, lon2, cos_lat1):
+    """
+    Squared flat-Earth distance in feet (no sqrt; works on NumPy arrays too).
+
+    Args:
+        lat1, lon1: First point (degrees).
+        lat2, lon2: Second point (degrees).
+        cos_lat1: cos(radians(lat1)), precomputed when lat1 is fixed.
+
+    Returns:
+        Squared distance in feet^2.
+    """
+    delta_x_feet = (lon2 - lon1) * FEET_PER_DEGREE_LAT * cos_lat1
+    delta_y_feet = (lat2 - lat1) * FEET_PER_DEGREE_LAT
+    return delta_x_feet * delta_x_feet + delta_y_feet * delta_y_feet
+
+
 def calculate_distance_between_points(p1: PositionData, p2: PositionData) -> float:
     """
     Distance between two positions in miles (flat-Earth approximation).
@@ -31,12 +52,6 @@ def calculate_distance_between_points(p1: PositionData, p2: PositionData) -> flo
     Returns:
         Distance in miles.
     """
-    if not (isinstance(p1, PositionData) and isinstance(p2, PositionData)):
-        return 9999999.0
-    lat1_rad = math.radians(p1.lat)
-    delta_lat_deg = p2.lat - p1.lat
-    delta_lon_deg = p2.lon - p1.lon
-    delta_y_feet = delta_lat_deg * FEET_PER_DEGREE_LAT
-    delta_x_feet = delta_lon_deg * FEET_PER_DEGREE_LAT * math.cos(lat1_rad)
-    distance_feet = math.sqrt(delta_x_feet**2 + delta_y_feet**2)
+    cos_lat1 = math.cos(math.radians(p1.lat))
+    distance_feet = math.sqrt(squared_distance_feet(p1.lat, p1.lon, p2.lat, p2.lon, cos_lat1))
     return distance_feet / FEET_PER_MILE
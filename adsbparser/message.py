@@ -1,6 +1,9 @@
-"""ADSB message type used when loading parquet data."""
+"""ADSB message types used when loading parquet data."""
 
-from datetime import datetime
+from dataclasses import dataclass, fields
+from typing import Iterator, Sequence
+
+import numpy as np
 
 
 class AdsbMessage:
@@ -8,30 +11,71 @@ class AdsbMessage:
     A single ADSB message from parquet (beast format).
 
     Attributes:
-        t_stamp: Message timestamp as datetime.
-        adsbMsg: Hex payload string (after beast header).
+        t_stamp: Message timestamp as epoch milliseconds.
+        adsbMsg: Mode S frame bytes (payload after beast header).
         r_ID: Receiver id.
         extractedParquetFile: Source parquet filename.
-        full_raw_bytes: Full beast message as hex string (used for position decode).
     """
 
+    __slots__ = ("t_stamp", "adsbMsg", "r_ID", "extractedParquetFile")
+
     def __init__(
         self,
-        t_stamp: int | float | datetime,
-        adsbMSG: str,
+        t_stamp: int,
+        adsbMSG: bytes,
         r_id: str,
         extractedParquetFile: str,
-        full_raw_bytes: str,
     ):
-        if isinstance(t_stamp, datetime):
-            self.t_stamp = t_stamp
-        elif hasattr(t_stamp, "to_pydatetime"):
-            self.t_stamp = t_stamp.to_pydatetime()  # pandas Timestamp
-        elif isinstance(t_stamp, (int, float)):
-            self.t_stamp = datetime.fromtimestamp(float(t_stamp) / 1000.0)
-        else:
-            self.t_stamp = t_stamp
+        self.t_stamp = t_stamp
         self.adsbMsg = adsbMSG
         self.r_ID = r_id
         self.extractedParquetFile = extractedParquetFile
-        self.full_raw_bytes = full_raw_bytes
+
+
+@dataclass
+class PlaneColumns:
+    """
+    All ADSB messages of one ICAO as parallel arrays (one row per message).
+
+    Attributes:
+        ts: Message timestamps as int64 epoch milliseconds.
+        payload: (N, 14) uint8 Mode S frames (after beast header); 56-bit
+            frames fill the first 7 bytes and are zero-padded.
+        payload_len: Frame length in bytes (7 or 14) of each row.
+        r_id: Receiver ids.
+        extractedParquetFile: Source parquet filename of each message.
+    """
+
+    ts: np.ndarray
+    payload: np.ndarray
+    payload_len: np.ndarray
+    r_id: np.ndarray
+    extractedParquetFile: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def take(self, idx: np.ndarray) -> "PlaneColumns":
+        """Return the rows at idx (e.g. a sort order) as new PlaneColumns."""
+        return PlaneColumns(*(getattr(self, f.name)[idx] for f in fields(self)))
+
+    @staticmethod
+    def concatenate(parts: Sequence["PlaneColumns"]) -> "PlaneColumns":
+        """Stack the rows of several PlaneColumns (e.g. one per file) in order."""
+        return PlaneColumns(
+            *(
+                np.concatenate([getattr(p, f.name) for p in parts])
+                for f in fields(PlaneColumns)
+            )
+        )
+
+    def messages(self) -> Iterator[AdsbMessage]:
+        """Yield the rows as AdsbMessage objects."""
+        for t_stamp, frame, frame_len, r_id, filename in zip(
+            self.ts.tolist(),
+            self.payload,
+            self.payload_len.tolist(),
+            self.r_id,
+            self.extractedParquetFile,
+        ):
+            yield AdsbMessage(t_stamp, frame[:frame_len].tobytes(), r_id, filename)
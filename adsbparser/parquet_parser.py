@@ -4,47 +4,46 @@ Load ADSB messages from parquet files and decode positions (CPR even/odd).
 
 import os
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-import pandas as pd
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
-import pyModeS as pms
 
+from adsbparser._cpr_numba import pair_positions
 from adsbparser.config import ParquetColNames
-from adsbparser.message import AdsbMessage
+from adsbparser.message import PlaneColumns
+
+# Beast header bytes before the Mode S frame; frames are 56 or 112 bits
+BEAST_HEADER_LEN = 8
+MODES_FRAME_LENS = (7, 14)
+MODES_LONG_FRAME_LEN = 14
+
+# Rows per record batch when streaming a parquet file
+PARQUET_BATCH_SIZE = 65536
+
+# Mode S parity generator polynomial (CRC-24, 0x1FFF409 without the x^24 term)
+_CRC24_POLY = 0xFFF409
 
 
 def beast_raw_to_hex(raw: bytes | str) -> str:
     """Convert beast raw bytes (or latin-1 string) to full hex string."""
-    if isinstance(raw, bytes):
-        return "".join(f"{b:02x}" for b in raw)
     if isinstance(raw, str):
-        try:
-            raw = raw.encode("latin-1", errors="replace")
-        except Exception as e:
-            print(f"Error encoding string to bytes: {e}")
-            raw = b""
-        return "".join(f"{b:02x}" for b in raw)
+        raw = raw.encode("latin-1", errors="replace")
+    if isinstance(raw, bytes):
+        return raw.hex()
     print("Error: raw is neither bytes nor str.")
     return ""
 
 
 def beast_payload_hex(raw: bytes | str) -> str:
     """Extract payload hex from beast message (after first 8 bytes)."""
+    if isinstance(raw, str):
+        raw = raw.encode("latin-1", errors="replace")
     if isinstance(raw, bytes):
-        raw = raw.decode("utf-8", errors="replace")[16:]
-    elif isinstance(raw, str):
-        try:
-            raw = raw.encode("latin-1", errors="replace")
-        except Exception as e:
-            print(f"Error encoding string to bytes: {e}")
-            raw = b""
-        raw = raw[8:] if len(raw) >= 8 else b""
-        raw = "".join(f"{b:02x}" for b in raw)
-    else:
-        raw = ""
-    return raw if isinstance(raw, str) else ""
+        return raw[BEAST_HEADER_LEN:].hex()
+    return ""
 
 
 def is_valid_parquet_file(file_path: Path) -> bool:
@@ -58,147 +57,266 @@ def is_valid_parquet_file(file_path: Path) -> bool:
     return True
 
 
-def read_parquet_table(file_path: Path) -> pa.Table | None:
-    """Read a parquet file into a PyArrow table. Returns None on error."""
+def iter_parquet_batches(
+    file_path: Path,
+    columns: List[str] | None = None,
+    batch_size: int = PARQUET_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Stream a parquet file (only columns, if given) as record batches.
+
+    Each batch is decoded when requested, so only one batch of Arrow buffers
+    is alive at a time. A read error is printed and ends the stream.
+
+    Args:
+        file_path: Path to a .parquet file.
+        columns: Column names to read; all columns if None.
+        batch_size: Maximum rows per batch.
+
+    Yields:
+        pyarrow RecordBatch.
+    """
     try:
-        return pq.read_table(file_path.as_posix())
+        parquet_file = pq.ParquetFile(file_path.as_posix(), memory_map=True, pre_buffer=True)
+        yield from parquet_file.iter_batches(
+            batch_size=batch_size, columns=columns, use_threads=True
+        )
     except Exception as e:
         print(f"Error reading {file_path.as_posix()}: {e}")
-        return None
 
 
-def decode_beast_column(column: pa.ChunkedArray) -> List[str]:
-    """Decode beast column to list of strings (handles Unicode errors)."""
-    out = []
-    for val in column:
-        try:
-            out.append(val.as_py())
-        except UnicodeDecodeError:
-            raw = val.as_buffer().to_pybytes()
-            out.append(raw.decode("latin-1", errors="replace"))
-    return out
+def epoch_ms_column(column: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    """Return a timestamp column as int64 epoch milliseconds (ints pass through)."""
+    if pa.types.is_timestamp(column.type):
+        return column.cast(pa.timestamp("ms", tz=column.type.tz), safe=False).cast(pa.int64())
+    return column.cast(pa.int64())
 
 
-def parquet_table_to_dataframe(table: pa.Table) -> pd.DataFrame:
-    """Build a DataFrame from a parquet table; beast column is decoded."""
-    data = {}
-    for name, column in zip(table.schema.names, table.columns):
-        if name == ParquetColNames.BEAST_COL_NAME:
-            data[name] = decode_beast_column(column)
-        else:
-            data[name] = column.to_pylist()
-    return pd.DataFrame(data)
+def beast_payload_frames(
+    column: pa.Array | pa.ChunkedArray,
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Cut the Mode S frames out of a beast column straight from the Arrow buffers.
 
+    Args:
+        column: Beast messages as string or binary (strings may hold invalid UTF-8).
 
-def sort_messages_by_timestamp(plane_data: Dict[str, List[AdsbMessage]]) -> None:
-    """Sort each ICAO's message list by t_stamp in place."""
-    for key in plane_data:
-        plane_data[key] = sorted(plane_data[key], key=lambda m: m.t_stamp)
+    Returns:
+        Frame length in bytes (7 or 14) -> (row indices, (N, length) uint8 frames).
+        Rows whose payload is neither length are left out.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    if pa.types.is_string(column.type):
+        column = column.cast(pa.binary())
+    elif pa.types.is_large_string(column.type):
+        column = column.cast(pa.large_binary())
+    offset_type = np.int64 if pa.types.is_large_binary(column.type) else np.int32
+    _, offsets_buf, data_buf = column.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=offset_type)[
+        column.offset : column.offset + len(column) + 1
+    ]
+    data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else None
+    payload_lens = np.diff(offsets) - BEAST_HEADER_LEN
+
+    frames: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    for frame_len in MODES_FRAME_LENS:
+        rows = np.flatnonzero(payload_lens == frame_len)
+        if len(rows) == 0:
+            continue
+        starts = offsets[rows] + BEAST_HEADER_LEN
+        frames[frame_len] = (rows, data[starts[:, None] + np.arange(frame_len)])
+    return frames
 
 
-def _message_28_hex(msg: AdsbMessage) -> str:
-    """Extract 28-hex (112-bit) ADS-B payload for pyModeS."""
-    raw = getattr(msg, "full_raw_bytes", "") or ""
-    if isinstance(raw, bytes):
-        raw = raw.decode("latin-1", errors="replace")
-    hex_str = raw if isinstance(raw, str) else ""
-    return hex_str[-28:] if len(hex_str) >= 28 else ""
+def _crc24_table() -> np.ndarray:
+    """Byte-wise lookup table for the Mode S CRC-24."""
+    table = np.arange(256, dtype=np.int64) << 16
+    for _ in range(8):
+        table = ((table << 1) ^ np.where(table & 0x800000, _CRC24_POLY, 0)) & 0xFFFFFF
+    return table
+
+
+_CRC24_TABLE = _crc24_table()
+
+
+def frame_icao(frames: np.ndarray) -> np.ndarray:
+    """
+    ICAO address of each Mode S frame, as pyModeS common.icao computes it.
+
+    DF11/17/18 carry the address in bytes 1-3; for DF0/4/5/16/20/21 it is the
+    CRC of the frame XOR its address/parity field.
+
+    Args:
+        frames: (N, 7) or (N, 14) uint8 frames.
+
+    Returns:
+        int64 addresses; 0 for downlink formats without one.
+    """
+    b = frames.astype(np.int64)
+    df = b[:, 0] >> 3
+    direct = (b[:, 1] << 16) | (b[:, 2] << 8) | b[:, 3]
+    crc = np.zeros(len(b), dtype=np.int64)
+    for k in range(b.shape[1] - 3):
+        crc = ((crc << 8) & 0xFFFFFF) ^ _CRC24_TABLE[((crc >> 16) ^ b[:, k]) & 0xFF]
+    parity = (b[:, -3] << 16) | (b[:, -2] << 8) | b[:, -1]
+    return np.select(
+        [np.isin(df, (11, 17, 18)), np.isin(df, (0, 4, 5, 16, 20, 21))],
+        [direct, crc ^ parity],
+        0,
+    )
+
+
+def sort_messages_by_timestamp(plane_data: Dict[str, PlaneColumns]) -> None:
+    """Sort each ICAO's messages by ts in place (stable, ties keep load order)."""
+    for key, cols in plane_data.items():
+        # Files are written in time order, so most ICAOs need no reordering at all
+        if np.all(cols.ts[1:] >= cols.ts[:-1]):
+            continue
+        plane_data[key] = cols.take(np.argsort(cols.ts, kind="stable"))
+
+
+def _airborne_position_fields(
+    frames: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extract CPR fields from (N, 14) ADS-B frames with bit operations.
+
+    Args:
+        frames: (N, 14) uint8 frames (PlaneColumns.payload).
+
+    Returns:
+        (typecode, oe_flag, lat_cpr, lon_cpr) as int32 arrays. Typecode is -1
+        for frames that are not DF17/DF18.
+    """
+    b = frames.astype(np.int32)
+    df = b[:, 0] >> 3
+    tc = np.where((df == 17) | (df == 18), b[:, 4] >> 3, -1)
+    oe = (b[:, 6] >> 2) & 1
+    lat_cpr = ((b[:, 6] & 0x03) << 15) | (b[:, 7] << 7) | (b[:, 8] >> 1)
+    lon_cpr = ((b[:, 8] & 0x01) << 16) | (b[:, 9] << 8) | b[:, 10]
+    return tc, oe, lat_cpr, lon_cpr
 
 
 def decode_positions_from_messages(
-    plane_data: Dict[str, List[AdsbMessage]],
+    plane_data: Dict[str, PlaneColumns],
 ) -> List[Tuple[float, float]]:
     """
     Decode (lat, lon) from all ICAO message lists using CPR even/odd pairs.
 
+    Frames of all ICAOs are packed into one array so type code, odd/even flag
+    and CPR fields are extracted in a single vectorized pass; only airborne
+    position frames are then paired and decoded by the compiled CPR kernel.
+
     Args:
-        plane_data: ICAO -> list of AdsbMessage (from load_adsb_messages_by_icao).
+        plane_data: ICAO -> PlaneColumns (from load_adsb_messages_by_icao).
 
     Returns:
         List of (lat, lon) for all decoded positions.
     """
     sort_messages_by_timestamp(plane_data)
-    all_positions: List[Tuple[float, float]] = []
-
-    for icao, packets in plane_data.items():
-        if not packets:
-            continue
-        msg_even, msg_odd = None, None
-        t_even, t_odd = None, None
-
-        for m in packets:
-            try:
-                msg_28 = _message_28_hex(m)
-                if len(msg_28) != 28:
-                    continue
-                tc = pms.adsb.typecode(msg_28)
-                if tc < 9 or tc == 19 or tc > 22:
-                    continue
-                ts = m.t_stamp
-                if hasattr(ts, "timestamp"):
-                    ts = int(ts.timestamp())
-                elif hasattr(ts, "value"):
-                    ts = int(ts) // 1000 if int(ts) > 1e12 else int(ts)
-                else:
-                    ts = int(ts) // 1000 if int(ts) > 1e12 else int(ts)
-
-                if pms.adsb.oe_flag(msg_28) == 0:
-                    msg_even, t_even = msg_28, ts
-                else:
-                    msg_odd, t_odd = msg_28, ts
-
-                if msg_even and msg_odd and t_even is not None and t_odd is not None:
-                    try:
-                        lat, lon = pms.adsb.position(msg_even, msg_odd, t_even, t_odd)
-                        if lat is not None and lon is not None:
-                            all_positions.append((float(lat), float(lon)))
-                    except (RuntimeError, ValueError):
-                        pass
-                    msg_even = msg_odd = None
-                    t_even = t_odd = None
-            except (IndexError, TypeError, KeyError):
-                continue
-
-    return all_positions
-
-
-def load_adsb_messages_by_icao(
-    file_path: Path,
-    plane_data: Dict[str, List[AdsbMessage]],
-) -> bool:
+    planes = [cols for cols in plane_data.values() if len(cols)]
+    if not planes:
+        return []
+    frames = np.concatenate([cols.payload for cols in planes])
+    is_long = np.concatenate([cols.payload_len for cols in planes]) == MODES_LONG_FRAME_LEN
+    t_stamps = np.concatenate([cols.ts for cols in planes]) // 1000
+    groups = np.repeat(np.arange(len(planes)), [len(cols) for cols in planes])
+
+    tc, oe, lat_cpr, lon_cpr = _airborne_position_fields(frames)
+    # Airborne position: type codes 9-18 (baro altitude) and 20-22 (GNSS)
+    baro = (tc >= 9) & (tc <= 18)
+    airborne = np.flatnonzero(is_long & (baro | ((tc >= 20) & (tc <= 22))))
+
+    out = np.empty((len(airborne), 2), dtype=np.float64)
+    n = pair_positions(
+        groups[airborne],
+        oe[airborne],
+        baro[airborne],
+        lat_cpr[airborne],
+        lon_cpr[airborne],
+        t_stamps[airborne],
+        out,
+    )
+    return [(lat, lon) for lat, lon in out[:n].tolist()]
+
+
+def _group_batch_by_icao(batch: pa.RecordBatch, filename: str) -> Dict[str, PlaneColumns]:
+    """Extract ICAO addresses of one record batch and group its messages by ICAO."""
+    # Timestamps and receiver ids are converted once per column, then gathered per ICAO
+    ts_all = epoch_ms_column(batch.column(ParquetColNames.isoTstamp_COL_NAME)).to_numpy()
+    rid_all = batch.column(ParquetColNames.receiverID_COL_NAME).to_numpy(zero_copy_only=False)
+
+    # ICAO address and frame bytes for all rows, one length class of frames at a time
+    n_rows = batch.num_rows
+    addr_all = np.zeros(n_rows, dtype=np.int64)
+    payload_all = np.zeros((n_rows, MODES_LONG_FRAME_LEN), dtype=np.uint8)
+    payload_len_all = np.zeros(n_rows, dtype=np.int8)
+    beast_col = batch.column(ParquetColNames.BEAST_COL_NAME)
+    for frame_len, (rows, frames) in beast_payload_frames(beast_col).items():
+        addr_all[rows] = frame_icao(frames)
+        payload_all[rows, :frame_len] = frames
+        payload_len_all[rows] = frame_len
+
+    # Group in Arrow: sort rows by (address, time), then cut at the address runs
+    valid = np.flatnonzero(addr_all)
+    grouped = pa.table(
+        {"icao": addr_all[valid], "ts": ts_all[valid], "row": valid}
+    ).sort_by([("icao", "ascending"), ("ts", "ascending"), ("row", "ascending")])
+    rows_sorted = grouped.column("row").to_numpy()
+    runs = pc.value_counts(grouped.column("icao"))
+    bounds = np.concatenate(([0], np.cumsum(runs.field("counts").to_numpy())))
+
+    plane_data: Dict[str, PlaneColumns] = {}
+    for addr, start, end in zip(runs.field("values").to_pylist(), bounds[:-1], bounds[1:]):
+        idx = rows_sorted[start:end]
+        plane_data[f"{addr:06x}"] = PlaneColumns(
+            ts=ts_all[idx].astype(np.int64, copy=False),
+            payload=payload_all[idx],
+            payload_len=payload_len_all[idx],
+            r_id=rid_all[idx],
+            extractedParquetFile=np.full(len(idx), filename, dtype=object),
+        )
+    return plane_data
+
+
+def load_adsb_messages_by_icao(file_path: Path) -> Dict[str, PlaneColumns]:
     """
-    Load one parquet file and merge ADSB messages into plane_data by ICAO.
+    Load one parquet file and group its ADSB messages by ICAO.
+
+    The file is streamed in record batches; each batch is grouped on its own
+    and the groups are merged in batch order. Files are independent, so this
+    can run in worker processes; combine the results with merge_plane_data.
 
     Args:
         file_path: Path to a .parquet file.
-        plane_data: Dict to update: ICAO (lowercase) -> list of AdsbMessage.
 
     Returns:
-        True if the file was loaded successfully, False otherwise.
+        ICAO (lowercase) -> PlaneColumns; empty if the file could not be loaded.
     """
     if not is_valid_parquet_file(file_path):
-        return False
-    table = read_parquet_table(file_path)
-    if table is None:
-        return False
-    df = parquet_table_to_dataframe(table)
-    if df.empty:
-        return False
-
+        return {}
+    batches = iter_parquet_batches(
+        file_path,
+        columns=[
+            ParquetColNames.BEAST_COL_NAME,
+            ParquetColNames.isoTstamp_COL_NAME,
+            ParquetColNames.receiverID_COL_NAME,
+        ],
+    )
     filename = os.path.basename(file_path)
-    for beast_bytes, t_stamp, receiver_id in zip(
-        df[ParquetColNames.BEAST_COL_NAME],
-        df[ParquetColNames.isoTstamp_COL_NAME],
-        df[ParquetColNames.receiverID_COL_NAME],
-    ):
-        payload_hex = beast_payload_hex(beast_bytes)
-        full_hex = beast_raw_to_hex(beast_bytes)
-        icao = pms.adsb.icao(full_hex[16:])
-        if icao is None or icao == "000000":
-            continue
-        icao = icao.lower()
-        msg = AdsbMessage(t_stamp, payload_hex, receiver_id, filename, full_hex)
-        if icao not in plane_data:
-            plane_data[icao] = []
-        plane_data[icao].append(msg)
-    return True
+    return merge_plane_data(_group_batch_by_icao(batch, filename) for batch in batches)
+
+
+def merge_plane_data(
+    partials: Iterable[Dict[str, PlaneColumns]],
+) -> Dict[str, PlaneColumns]:
+    """Combine per-file (or per-batch) results in order into one ICAO -> PlaneColumns dict."""
+    parts: Dict[str, List[PlaneColumns]] = {}
+    for partial in partials:
+        for icao, cols in partial.items():
+            parts.setdefault(icao, []).append(cols)
+    return {
+        icao: cols[0] if len(cols) == 1 else PlaneColumns.concatenate(cols)
+        for icao, cols in parts.items()
+    }
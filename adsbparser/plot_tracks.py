@@ -7,8 +7,10 @@ import time
 from pathlib import Path
 from typing import List, Sequence, Tuple
 
+import numpy as np
+
 from adsbparser.config import DataVisualizer
-from adsbparser.geo import PositionData, calculate_distance_between_points
+from adsbparser.geo import FEET_PER_MILE, squared_distance_feet
 
 try:
     import folium
@@ -46,6 +48,9 @@ def filter_positions_near(
     """
     Keep only positions within radius_miles of (center_lat, center_lon).
 
+    Flat-Earth distance (adsbparser.geo.squared_distance_feet) from the
+    center, evaluated for all positions at once.
+
     Args:
         positions: List of (lat, lon).
         center_lat: Center latitude (degrees).
@@ -55,12 +60,13 @@ def filter_positions_near(
     Returns:
         Filtered list of (lat, lon).
     """
-    center = PositionData(center_lat, center_lon)
-    out = []
-    for lat, lon in positions:
-        if calculate_distance_between_points(PositionData(lat, lon), center) <= radius_miles:
-            out.append((lat, lon))
-    return out
+    arr = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    # cos(center) is the same for every point; compare squared feet to skip the sqrt
+    cos_c = math.cos(math.radians(center_lat))
+    thr_ft2 = (radius_miles * FEET_PER_MILE) ** 2
+    d2 = squared_distance_feet(center_lat, center_lon, arr[:, 0], arr[:, 1], cos_c)
+    mask = d2 <= thr_ft2
+    return [tuple(p) for p in arr[mask].tolist()]
 
 
 def _extent_for_radius_miles(
@@ -99,7 +105,7 @@ def plot_folium_map(
         zoom_start: Initial zoom; default from config.
         line_color: Polyline or marker color.
         line_weight: Polyline width (pixels).
-        as_points: If True, draw circle markers; else one polyline.
+        as_points: If True, draw circle markers (one GeoJSON layer); else one polyline.
 
     Returns:
         folium.Map instance.
@@ -110,21 +116,31 @@ def plot_folium_map(
     zoom_start = zoom_start if zoom_start is not None else DataVisualizer.mapZoom
     output_path = Path(output_path) if output_path else None
     m = folium.Map(location=center, zoom_start=zoom_start)
-    lats, lons = _lats_lons(positions)
-    if not lats or not lons:
+    if len(positions) == 0:
         return m
     if as_points:
-        for lat, lon in zip(lats, lons):
-            folium.CircleMarker(
-                location=[lat, lon],
+        # One GeoJSON MultiPoint layer instead of a CircleMarker object per position
+        points = {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {
+                "type": "MultiPoint",
+                "coordinates": [[lon, lat] for lat, lon in positions],
+            },
+        }
+        folium.GeoJson(
+            points,
+            name="Positions",
+            marker=folium.CircleMarker(
                 radius=3,
                 color=line_color,
                 fill=True,
                 fillOpacity=0.6,
-            ).add_to(m)
+            ),
+        ).add_to(m)
     else:
         PolyLine(
-            list(zip(lats, lons)),
+            list(positions),
             color=line_color,
             weight=line_weight,
             popup="Track",
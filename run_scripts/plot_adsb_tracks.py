@@ -11,7 +11,9 @@ Usage:
 """
 
 import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Ensure package is importable when run from repo root
@@ -21,6 +23,7 @@ from adsbparser.config import DataVisualizer
 from adsbparser.parquet_parser import (
     load_adsb_messages_by_icao,
     decode_positions_from_messages,
+    merge_plane_data,
 )
 from adsbparser.plot_tracks import (
     filter_positions_near,
@@ -42,12 +45,14 @@ def main():
         print(f"Data directory not found: {data_dir}")
         sys.exit(1)
 
-    plane_data = {}
-    for f in sorted(data_dir.glob("*.parquet")):
-        load_adsb_messages_by_icao(f, plane_data)
+    # Files are parsed independently in worker processes, merged in file order
+    paths = sorted(data_dir.glob("*.parquet"))
+    workers = max(1, min(len(paths), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        plane_data = merge_plane_data(executor.map(load_adsb_messages_by_icao, paths))
 
     total_msgs = sum(len(msgs) for msgs in plane_data.values())
-    print(f"Parsed {len(plane_data)} ICAO(s), {total_msgs} messages from {len(list(data_dir.glob('*.parquet')))} file(s)")
+    print(f"Parsed {len(plane_data)} ICAO(s), {total_msgs} messages from {len(paths)} file(s)")
 
     positions = decode_positions_from_messages(plane_data)
     print(f"Decoded {len(positions)} positions")